@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+local_mapreduce.py
+Local replacement for `mapper.py | sort | reducer.py` (no Hadoop shuffle).
+Reads CSV rows from stdin and prints:
+hashtag<TAB>total_mentions
+
+Expected CSV header:
+date,hashtag,mentions,estimated_reach,sentiment_score,top_country
+
+With pandas/numpy installed the whole input is parsed in C, hashtags are
+factorized to int codes and summed with one np.bincount; otherwise a
+csv.reader + Counter loop is used.
+
+Usage:
+    python local_mapreduce.py < dataset/hashtags.csv
+"""
+import sys
+import csv
+from collections import Counter
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:  # stdlib-only fallback
+    np = pd = None
+
+def safe_int(x):
+    try:
+        return int(x)
+    except Exception:
+        return 0
+
+def counter_totals(stream):
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return []
+    h_idx = header.index("hashtag")
+    m_idx = header.index("mentions")
+
+    totals = Counter()
+    for row in reader:
+        # Basic validation (same rules as mapper.py)
+        hashtag = row[h_idx].strip() if len(row) > h_idx else ""
+        if not hashtag:
+            continue
+        totals[hashtag] += safe_int(row[m_idx].strip()) if len(row) > m_idx else 0
+    return sorted(totals.items())
+
+def bincount_totals(stream):
+    try:
+        # everything as raw strings, so hashtags like "NA"/"null" are kept as mapper.py keeps them
+        df = pd.read_csv(stream, usecols=["hashtag", "mentions"], dtype=str, keep_default_na=False)
+    except pd.errors.EmptyDataError:
+        return []
+    hashtags = df["hashtag"].str.strip()
+    keep = (hashtags != "").to_numpy()
+    # same rule as safe_int in mapper.py: only plain integers count, anything else is 0
+    m = df["mentions"].str.strip()
+    mentions = m.where(m.str.fullmatch(r"[+-]?\d+"), "0").astype(np.int64).to_numpy()
+    codes, uniq = pd.factorize(hashtags[keep], sort=True)
+    # float64 weights are exact for totals below 2**53
+    totals = np.bincount(codes, weights=mentions[keep].astype(np.float64), minlength=len(uniq))
+    return zip(uniq, totals.round().astype(np.int64))
+
+totals = bincount_totals(sys.stdin) if pd is not None else counter_totals(sys.stdin)
+# same key order as the sorted Hadoop reducer output
+sys.stdout.write("".join(f"{h}\t{t}\n" for h, t in totals))
@@ -3,29 +3,27 @@
 reducer.py
 Aggregates 'hashtag<TAB>mentions' lines from stdin and prints:
 hashtag<TAB>total_mentions
+
+Input is the sorted output of mapper.py, which always emits well-formed
+'hashtag<TAB>int' lines, so stdin is streamed as bytes (no decoding,
+no per-line validation).
 """
 import sys
 
 current_hashtag = None
 current_total = 0
+out = sys.stdout.buffer
 
 def flush():
-    global current_hashtag, current_total
     if current_hashtag is not None:
-        print(f"{current_hashtag}\t{current_total}")
+        out.write(b"%s\t%d\n" % (current_hashtag, current_total))
 
-for line in sys.stdin:
-    line = line.strip()
+for line in sys.stdin.buffer:
+    line = line.rstrip(b"\r\n")
     if not line:
         continue
-    parts = line.split("\t")
-    if len(parts) != 2:
-        continue
-    hashtag, mentions_s = parts
-    try:
-        mentions = int(mentions_s)
-    except Exception:
-        mentions = 0
+    hashtag, _, mentions = line.rpartition(b"\t")
+    mentions = int(mentions)
 
     if current_hashtag == hashtag:
         current_total += mentions
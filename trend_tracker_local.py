@@ -11,15 +11,31 @@ End-to-end local Social Media Trend Tracker:
 - Produces `agg_counts.csv`, `trend_scores.csv`, `topk_per_window.csv`
 
 Usage:
-    pip install pandas
+    pip install pandas pyarrow   # pyarrow optional (fast CSV writer)
     python trend_tracker_local.py --input sample_posts.csv --window day --topk 10
+
+The input is streamed in chunks (--chunksize rows) and aggregated per chunk
+(--jobs worker processes), so peak memory is about (jobs + 1) x chunksize rows
+plus the number of hashtag x window groups.
 """
 
 import argparse
+import itertools
+import multiprocessing as mp
+from collections import deque
 import pandas as pd
 import numpy as np
-from datetime import datetime
-import math
+from pandas.api.types import union_categoricals
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # pyarrow is optional; write_csv falls back to DataFrame.to_csv
+    pa = None
+
+DATE_FORMATS = ("%d-%m-%Y", "%Y-%m-%d", "%d/%m/%Y")
+
+INPUT_COLS = ["date", "hashtag", "mentions", "estimated_reach", "sentiment_score"]
 
 def parse_args():
     p = argparse.ArgumentParser(description="Local Social Media Trend Tracker")
@@ -28,144 +44,254 @@ def parse_args():
                    help="Time window aggregation (day/week/month). Default: day")
     p.add_argument("--topk", "-k", type=int, default=10, help="Top-K per window. Default: 10")
     p.add_argument("--out_prefix", "-o", default="output", help="Output files prefix (default: output)")
+    p.add_argument("--chunksize", "-c", type=int, default=500_000,
+                   help="Rows read and aggregated per chunk. Default: 500000")
+    p.add_argument("--jobs", "-j", type=int, default=1,
+                   help="Worker processes aggregating chunks (1 = in-process); "
+                        "memory is about (jobs+1) x chunksize rows. Default: 1")
     return p.parse_args()
 
 def to_datetime_col(df, date_col="date"):
-    # Accepts DD-MM-YYYY, tries to parse common variants
-    def try_parse(x):
-        for fmt in ("%d-%m-%Y", "%Y-%m-%d", "%d/%m/%Y"):
-            try:
-                return datetime.strptime(x.strip(), fmt)
-            except Exception:
-                continue
-        raise ValueError(f"Unrecognized date format: {x}")
-    return pd.to_datetime(df[date_col].astype(str).map(try_parse))
+    # Accepts DD-MM-YYYY, tries to parse common variants.
+    # Each format is parsed vectorized with cache=True so repeated date strings are parsed once.
+    s = df[date_col].astype("string").str.strip()
+    out = pd.to_datetime(s, format=DATE_FORMATS[0], cache=True, errors="coerce")
+    for fmt in DATE_FORMATS[1:]:
+        mask = out.isna()
+        if not mask.any():
+            break
+        out.loc[mask] = pd.to_datetime(s[mask], format=fmt, cache=True, errors="coerce")
+    bad = out.isna()
+    if bad.any():
+        raise ValueError(f"Unrecognized date format: {s[bad].iloc[0]}")
+    return out
 
 def make_window_col(dt_series, window):
+    # Integer window codes straight from the datetime64 values (no per-row strftime):
+    # day -> days since epoch, month -> months since epoch, week -> ISO (Monday-based) weeks since epoch.
+    # Codes sort chronologically; format_windows turns them back into labels for output.
+    days = dt_series.to_numpy().astype("datetime64[D]").view(np.int64)
+    if window == "day":
+        return days.astype(np.int32)
+    elif window == "week":
+        # 1970-01-01 is a Thursday, so shifting by 3 days aligns weeks to Mondays
+        return ((days + 3) // 7).astype(np.int32)
+    elif window == "month":
+        return dt_series.to_numpy().astype("datetime64[M]").view(np.int64).astype(np.int32)
+    else:
+        raise ValueError("Invalid window")
+
+def format_windows(codes, window):
+    # Stringify window codes once per unique value: YYYY-MM-DD, YYYY-Www (ISO year-week) or YYYY-MM
+    uniq, inv = np.unique(np.asarray(codes), return_inverse=True)
+    uniq = uniq.astype(np.int64)
     if window == "day":
-        return dt_series.dt.strftime("%Y-%m-%d")
+        labels = uniq.astype("datetime64[D]").astype(str)
     elif window == "week":
-        # ISO week number with year (YYYY-Www)
-        return dt_series.dt.strftime("%G-W%V")  # ISO year-week
+        mondays = pd.DatetimeIndex((uniq * 7 - 3).astype("datetime64[D]"))
+        labels = np.asarray(mondays.strftime("%G-W%V"), dtype=object)
     elif window == "month":
-        return dt_series.dt.strftime("%Y-%m")
+        labels = uniq.astype("datetime64[M]").astype(str)
     else:
         raise ValueError("Invalid window")
+    return labels.astype(object)[inv]
+
+def with_labels(df, window, hashtag_names):
+    # copy of df with hashtag/window codes replaced by their string labels (for CSV/console output)
+    out = df.copy()
+    pos = out.columns.get_loc("hashtag_code")
+    out.insert(pos, "hashtag", hashtag_names[out.pop("hashtag_code").to_numpy()])
+    out["window"] = format_windows(out["window"], window)
+    return out
 
 def aggregate(df, window_col):
-    # Group by hashtag & window: sum mentions, sum reach, avg sentiment (weighted by count)
-    agg = df.groupby(["hashtag", window_col], as_index=False).agg(
+    # Group by hashtag & window: sum mentions, sum reach, sum sentiment and row count.
+    # Sentiment is kept as a sum so partial aggregates merge exactly; merge_partials takes the mean.
+    # Keys are a hashtag categorical and int32 window codes: observed=True/sort=False
+    # group on small integers only
+    agg = df.groupby(["hashtag", window_col], as_index=False, observed=True, sort=False).agg(
         mentions_sum = ("mentions", "sum"),
         reach_sum = ("estimated_reach", "sum"),
-        sentiment_avg = ("sentiment_score", "mean"),
+        sentiment_sum = ("sentiment_score", "sum"),
         rows_count = ("hashtag", "count")
     )
     agg = agg.rename(columns={window_col: "window"})
     return agg
 
+def merge_partials(parts):
+    # Combine per-chunk aggregates (map-side combine), then average sentiment once over all rows.
+    # Chunk categoricals are unified into one sorted hashtag table; everything downstream works on
+    # its int codes (code order == hashtag order) and hashtag_names is only used for output.
+    hashtags = union_categoricals([p["hashtag"] for p in parts], sort_categories=True)
+    hashtag_names = np.asarray(hashtags.categories, dtype=object)
+    combined = pd.concat([p.drop(columns="hashtag") for p in parts], ignore_index=True)
+    combined.insert(0, "hashtag_code", hashtags.codes.astype(np.int32))
+    final = combined.groupby(["hashtag_code", "window"], as_index=False).agg(
+        mentions_sum = ("mentions_sum", "sum"),
+        reach_sum = ("reach_sum", "sum"),
+        sentiment_sum = ("sentiment_sum", "sum"),
+        rows_count = ("rows_count", "sum")
+    )
+    # mean in place, so sentiment_avg keeps its column position in the agg CSV
+    final["sentiment_sum"] = final["sentiment_sum"] / final["rows_count"]
+    final = final.rename(columns={"sentiment_sum": "sentiment_avg"})
+    return final, hashtag_names
+
 def compute_trend_scores(agg_df):
     # For each hashtag, sort windows in chronological order -> compute growth & score
-    # First need an ordering key for windows to sort chronologically.
-    # We'll convert window strings back to dates for ordering where possible.
-    def window_to_sortkey(w):
-        try:
-            # day: YYYY-MM-DD, month: YYYY-MM, week: YYYY-Www
-            if len(w) == 10:  # YYYY-MM-DD
-                return datetime.strptime(w, "%Y-%m-%d")
-            if "-W" in w:  # YYYY-Www
-                return pd.to_datetime(w + "-1", format="%G-W%V-%u")  # convert week to date (Mon)
-            if len(w) == 7:  # YYYY-MM
-                return datetime.strptime(w, "%Y-%m")
-        except Exception:
-            pass
-        return datetime.min
-
-    rows = []
-    for h, group in agg_df.groupby("hashtag"):
-        g = group.copy()
-        # compute sort key
-        g["_sort"] = g["window"].map(window_to_sortkey)
-        g = g.sort_values("_sort")
-        prev_mentions = None
-        for _, r in g.iterrows():
-            mentions = int(r["mentions_sum"])
-            reach = int(r["reach_sum"])
-            sentiment = float(r["sentiment_avg"]) if not pd.isna(r["sentiment_avg"]) else 0.0
-            # growth relative to previous window
-            if prev_mentions is None:
-                growth = 0.0
-            else:
-                growth = (mentions - prev_mentions) / (prev_mentions + 1.0)
-            # score formula: growth * log(reach+1) * (1 + sentiment)
-            try:
-                score = growth * math.log(reach + 1.0) * (1.0 + sentiment)
-            except Exception:
-                score = growth
-            if math.isnan(score) or math.isinf(score):
-                score = growth
-            rows.append({
-                "hashtag": h,
-                "window": r["window"],
-                "score": score,
-                "mentions": mentions,
-                "reach": reach,
-                "sentiment": sentiment,
-                "rows_count": int(r["rows_count"])
-            })
-            prev_mentions = mentions
-    trend_df = pd.DataFrame(rows)
+    # Window codes are integers that already sort chronologically.
+    agg_df = agg_df.sort_values(["hashtag_code", "window"], kind="stable")
+    gid = agg_df["hashtag_code"].to_numpy()
+    mentions = agg_df["mentions_sum"].to_numpy(dtype=np.int64)
+    reach = agg_df["reach_sum"].to_numpy(dtype=np.int64)
+    sentiment = np.nan_to_num(agg_df["sentiment_avg"].to_numpy(dtype=np.float64))
+    # score formula: growth * log(reach+1) * (1 + sentiment)
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        log_reach = np.log1p(reach.astype(np.float64))
+        # growth relative to previous window of the same hashtag (0 for the first window)
+        same = np.zeros(len(gid), dtype=bool)
+        same[1:] = gid[1:] == gid[:-1]
+        prev = np.zeros(len(gid), dtype=np.int64)
+        prev[1:] = mentions[:-1]
+        growth = np.where(same, (mentions - prev) / (prev + 1.0), 0.0)
+        score = growth * log_reach * (1.0 + sentiment)
+    score = np.nan_to_num(score, nan=0.0, posinf=0.0, neginf=0.0)
+    trend_df = pd.DataFrame({
+        "hashtag_code": gid,
+        "window": agg_df["window"].to_numpy(),
+        "score": score,
+        "mentions": mentions,
+        "reach": reach,
+        "sentiment": sentiment,
+        "rows_count": agg_df["rows_count"].to_numpy(dtype=np.int64)
+    })
     # ensure deterministic ordering
-    trend_df = trend_df.sort_values(["window", "score"], ascending=[True, False]).reset_index(drop=True)
+    trend_df = trend_df.sort_values(["window", "score"], ascending=[True, False], kind="stable").reset_index(drop=True)
     return trend_df
 
 def topk_per_window(trend_df, k):
-    out_rows = []
-    for w, g in trend_df.groupby("window"):
-        topk = g.sort_values("score", ascending=False).head(k)
-        for _, r in topk.iterrows():
-            out_rows.append({
-                "window": w,
-                "hashtag": r["hashtag"],
-                "score": r["score"],
-                "mentions": int(r["mentions"]),
-                "reach": int(r["reach"]),
-                "sentiment": float(r["sentiment"]),
-                "rows_count": int(r["rows_count"])
-            })
-    topk_df = pd.DataFrame(out_rows)
-    topk_df = topk_df.sort_values(["window","score"], ascending=[True, False]).reset_index(drop=True)
-    return topk_df
+    # Expects trend_df as returned by compute_trend_scores: sorted by (window, score desc).
+    # Each window is then a contiguous [start, end) slice, and picking positions in ascending
+    # order keeps that ordering, so no sort is needed here.
+    cols = ["window", "hashtag_code", "score", "mentions", "reach", "sentiment", "rows_count"]
+    if k <= 0:
+        return trend_df[cols].iloc[:0].reset_index(drop=True)
+    windows = trend_df["window"].to_numpy()
+    scores = trend_df["score"].to_numpy(dtype=np.float64)
+    # window codes are sorted ints: slice starts are where the code changes (one linear pass,
+    # unlike np.unique which sorts again)
+    starts = np.flatnonzero(np.r_[True, windows[1:] != windows[:-1]])
+    bounds = np.append(starts, len(windows))
+    picked = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        seg = scores[start:end]
+        if end - start <= k:
+            picked.append(np.arange(start, end))
+            continue
+        # O(G) selection of the k-th best score; ties at the cut-off keep input order
+        kth = seg[np.argpartition(-seg, k - 1)[k - 1]]
+        above = np.flatnonzero(seg > kth)
+        ties = np.flatnonzero(seg == kth)[:k - len(above)]
+        picked.append(start + np.sort(np.concatenate([above, ties])))
+    all_idx = np.concatenate(picked) if picked else np.array([], dtype=np.int64)
+    return trend_df[cols].iloc[all_idx].reset_index(drop=True)
+
+def read_chunks(path, chunksize):
+    # The pyarrow engine cannot stream, so chunks come from the C engine; numeric columns are
+    # parsed in C and to_numeric only does real work when a chunk contains invalid values.
+    reader = pd.read_csv(path, usecols=INPUT_COLS, dtype={"date": "string", "hashtag": "string"},
+                         chunksize=chunksize)
+    for df in reader:
+        for c in ("mentions", "estimated_reach", "sentiment_score"):
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+        df["mentions"] = narrow_int(df["mentions"].fillna(0).astype(np.int64))
+        df["estimated_reach"] = narrow_int(df["estimated_reach"].fillna(0).astype(np.int64))
+        df["sentiment_score"] = df["sentiment_score"].fillna(0.0).astype(np.float64)
+        yield df
+
+def narrow_int(col):
+    # Per-row counts almost always fit int32, which halves the bytes every groupby pass moves;
+    # keep int64 when a chunk does not fit. groupby sums still accumulate into int64.
+    info = np.iinfo(np.int32)
+    if col.empty or (col.min() >= info.min and col.max() <= info.max):
+        return col.astype(np.int32)
+    return col
+
+def aggregate_chunk(df, window):
+    # parse date
+    df["__dt"] = to_datetime_col(df, date_col="date")
+    # window column
+    df["window"] = make_window_col(df["__dt"], window)
+    # low-cardinality grouping key -> categorical, so groupby hashes int codes
+    df["hashtag"] = df["hashtag"].astype("category")
+    return aggregate(df, "window")
+
+def aggregate_chunks(chunks, window, jobs):
+    # Chunk aggregation is independent per chunk, so it runs in a process pool. At most
+    # jobs+1 chunks are in flight (Pool.imap would read ahead without bound), and results
+    # are collected in input order so the merged floats are reproducible run to run.
+    chunks = iter(chunks)
+    head = list(itertools.islice(chunks, 2))
+    if jobs <= 1 or len(head) < 2:
+        # single-chunk input: no pool, no pickling
+        return [aggregate_chunk(chunk, window) for chunk in itertools.chain(head, chunks)]
+    parts = []
+    pending = deque()
+    with mp.Pool(jobs) as pool:
+        for chunk in itertools.chain(head, chunks):
+            pending.append(pool.apply_async(aggregate_chunk, (chunk, window)))
+            if len(pending) > jobs:
+                parts.append(pending.popleft().get())
+        parts.extend(r.get() for r in pending)
+    return parts
+
+def write_csv(df, path):
+    # Arrow's multithreaded CSV writer when available. Arrow prints doubles with only ~15
+    # significant digits, so float columns are pre-formatted with numpy's round-trip repr
+    # to keep the same values pandas.to_csv writes.
+    if pa is None:
+        df.to_csv(path, index=False)
+        return
+    cols = {}
+    for c in df.columns:
+        values = df[c].to_numpy()
+        if values.dtype.kind == "f":
+            text = values.astype(str).astype(object)
+            text[np.isnan(values)] = None
+            cols[c] = pa.array(text, type=pa.string())
+        else:
+            cols[c] = pa.array(values)
+    # Arrow's "needed" quoting quotes every string; write unquoted like pandas and fall back
+    # to pandas if some value actually needs quoting (comma, quote or newline)
+    opts = pacsv.WriteOptions(quoting_style="none", quoting_header="none")
+    try:
+        pacsv.write_csv(pa.table(cols), path, write_options=opts)
+    except pa.ArrowInvalid:
+        df.to_csv(path, index=False)
 
 def main():
     args = parse_args()
     print("Reading CSV:", args.input)
-    df = pd.read_csv(args.input, dtype={"hashtag":str})
     # basic cleanup of expected columns
-    expected_cols = ["date","hashtag","mentions","estimated_reach","sentiment_score"]
-    missing = [c for c in expected_cols if c not in df.columns]
+    header = pd.read_csv(args.input, nrows=0).columns
+    missing = [c for c in INPUT_COLS if c not in header]
     if missing:
         raise SystemExit(f"Missing columns in input CSV: {missing}")
-    # parse date
-    df["__dt"] = to_datetime_col(df, date_col="date")
-    df["mentions"] = pd.to_numeric(df["mentions"], errors="coerce").fillna(0).astype(int)
-    df["estimated_reach"] = pd.to_numeric(df["estimated_reach"], errors="coerce").fillna(0).astype(int)
-    df["sentiment_score"] = pd.to_numeric(df["sentiment_score"], errors="coerce").fillna(0.0).astype(float)
-    # window column
-    df["window"] = make_window_col(df["__dt"], args.window)
-    # aggregate
-    agg_df = aggregate(df, "window")
+    # aggregate each chunk, then merge the small partial aggregates
+    parts = aggregate_chunks(read_chunks(args.input, args.chunksize), args.window, args.jobs)
+    agg_df, hashtag_names = merge_partials(parts)
     agg_out = f"{args.out_prefix}_agg_counts.csv"
-    agg_df.to_csv(agg_out, index=False)
+    write_csv(with_labels(agg_df, args.window, hashtag_names), agg_out)
     print("Wrote aggregated counts to:", agg_out)
     # trend scores
     trend_df = compute_trend_scores(agg_df)
     trend_out = f"{args.out_prefix}_trend_scores.csv"
-    trend_df.to_csv(trend_out, index=False)
+    write_csv(with_labels(trend_df, args.window, hashtag_names), trend_out)
     print("Wrote trend scores to:", trend_out)
     # top-k per window
-    topk_df = topk_per_window(trend_df, args.topk)
+    topk_df = with_labels(topk_per_window(trend_df, args.topk), args.window, hashtag_names)
     topk_out = f"{args.out_prefix}_topk_per_window.csv"
-    topk_df.to_csv(topk_out, index=False)
+    write_csv(topk_df, topk_out)
     print("Wrote top-K per window to:", topk_out)
     # print summary of top results to console (for quick check)
     print("\nTop results (first 20 rows):")